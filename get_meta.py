@@ -1,60 +1,128 @@
-import json
 import os
 import re
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 API_BASE = "https://api.quartr.com/public/v3"
 
 # Earnings-call event type IDs (per Quartr docs / your note)
 EARNINGS_CALL_EVENT_TYPE_IDS = {26, 27, 28, 29, 35, 36}
 
+# Concurrent page requests when the total result count is known up front
+MAX_PAGE_WORKERS = 8
 
+# Concurrent writers for the optional per-document meta files
+MAX_WRITE_WORKERS = 8
+
+# An existing _index.json younger than this is reused instead of re-fetched
+META_CACHE_TTL_SECONDS = 6 * 60 * 60
+
+_NON_SLUG_RE = re.compile(r"[^\w\s-]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
 def sanitize_slug(s: str, max_len: int = 80) -> str:
     s = s.strip().lower()
-    s = re.sub(r"[^\w\s-]", "", s)
-    s = re.sub(r"\s+", "-", s)
+    s = _NON_SLUG_RE.sub("", s)
+    s = _WHITESPACE_RE.sub("-", s)
     return (s[:max_len].strip("-")) or "item"
 
 
+@lru_cache(maxsize=None)
+def get_session(api_key: str) -> requests.Session:
+    """Shared keep-alive session (one per API key) so connections are pooled across calls."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504)),
+    )
+    session.mount("https://", adapter)
+    session.headers.update({"x-api-key": api_key})
+    return session
+
+
 def quartr_get(path: str, api_key: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     url = f"{API_BASE}{path}"
-    r = requests.get(url, headers={"x-api-key": api_key}, params=params, timeout=60)
+    r = get_session(api_key).get(url, params=params, timeout=60)
     r.raise_for_status()
     return r.json()
 
 
+def _fetch_transcripts_page(api_key: str, ticker: str, limit: int, cursor: int) -> Dict[str, Any]:
+    return quartr_get(
+        "/documents/transcripts",
+        api_key,
+        params={
+            "tickers": ticker.upper(),
+            "limit": limit,
+            "cursor": cursor,
+            "direction": "asc",
+            "expand": "event",  # required so we can read event.typeId
+        },
+    )
+
+
 def list_transcript_documents_by_ticker(api_key: str, ticker: str, limit: int = 200) -> List[Dict[str, Any]]:
     all_items: List[Dict[str, Any]] = []
-    cursor = 0
+    resp = _fetch_transcripts_page(api_key, ticker, limit, 0)
+    tried_concurrent = False
 
     while True:
-        resp = quartr_get(
-            "/documents/transcripts",
-            api_key,
-            params={
-                "tickers": ticker.upper(),
-                "limit": limit,
-                "cursor": cursor,
-                "direction": "asc",
-                "expand": "event",  # required so we can read event.typeId
-            },
-        )
-
         data = resp.get("data", [])
         if not isinstance(data, list) or not data:
             break
 
         all_items.extend(data)
 
-        next_cursor = (resp.get("pagination") or {}).get("nextCursor")
+        pagination = resp.get("pagination") or {}
+        next_cursor = pagination.get("nextCursor")
         if next_cursor is None:
             break
         cursor = int(next_cursor)
 
+        # If the first page proves offset semantics (nextCursor == rows returned)
+        # and the API reports the total size, request the remaining pages all at
+        # once. Anything else (keyset cursors, no total) pages sequentially.
+        total = pagination.get("total")
+        exact_total = isinstance(total, int)
+        step = len(data)
+        if not exact_total and isinstance(pagination.get("pageCount"), int):
+            total = pagination["pageCount"] * step
+        if not tried_concurrent and isinstance(total, int) and cursor == len(all_items):
+            tried_concurrent = True
+            with ThreadPoolExecutor(max_workers=MAX_PAGE_WORKERS) as ex:
+                pages = list(ex.map(
+                    lambda c: _fetch_transcripts_page(api_key, ticker, limit, c),
+                    range(cursor, total, step),
+                ))
+            page_datas = [p.get("data") if isinstance(p.get("data"), list) else [] for p in pages]
+            extra = [item for page_data in page_datas for item in page_data]
+            # Every page but the last must be full, and an exact total must match
+            consistent = all(len(d) == step for d in page_datas[:-1]) and (
+                not exact_total or len(all_items) + len(extra) == total
+            )
+            if consistent:
+                all_items.extend(extra)
+                # total/pageCount may under-report (e.g. rows added meanwhile);
+                # keep paging sequentially while the last page has a next cursor
+                last_next = (pages[-1].get("pagination") or {}).get("nextCursor") if pages else cursor
+                if last_next is None:
+                    break
+                cursor = int(last_next)
+
+        resp = _fetch_transcripts_page(api_key, ticker, limit, cursor)
+
     # Filter to earnings-call event types only
     filtered = []
     for item in all_items:
@@ -66,34 +134,70 @@ def list_transcript_documents_by_ticker(api_key: str, ticker: str, limit: int =
     return filtered
 
 
-def write_meta_files(ticker: str, items: List[Dict[str, Any]], base_dir: Optional[Path] = None) -> Path:
+def _meta_dir(ticker: str, base_dir: Optional[Path] = None) -> Path:
     base_dir = base_dir or Path.cwd()
-    ticker_slug = sanitize_slug(ticker)
+    return base_dir / "metadata" / sanitize_slug(ticker)
 
-    out_dir = base_dir / "metadata" / ticker_slug
-    out_dir.mkdir(parents=True, exist_ok=True)
 
-    for item in items:
-        doc_id = item.get("id")
-        event = item.get("event") or {}
-        title = event.get("title") or f"event_{item.get('eventId')}"
-        safe_title = sanitize_slug(str(title), max_len=80)
+def _write_doc_meta(out_dir: Path, item: Dict[str, Any]) -> None:
+    doc_id = item.get("id")
+    event = item.get("event") or {}
+    title = event.get("title") or f"event_{item.get('eventId')}"
+    safe_title = sanitize_slug(str(title), max_len=80)
+
+    if not isinstance(doc_id, int):
+        return
 
-        if not isinstance(doc_id, int):
-            continue
+    path = out_dir / f"{safe_title}_{doc_id}.json"
+    # Per-doc files are only read back by meta_to_txt.py, so keep them compact
+    path.write_bytes(orjson.dumps(item))
 
-        path = out_dir / f"{safe_title}_{doc_id}.json"
-        path.write_text(json.dumps(item, indent=2, ensure_ascii=False), encoding="utf-8")
+
+def write_meta_files(
+    ticker: str,
+    items: List[Dict[str, Any]],
+    base_dir: Optional[Path] = None,
+    write_per_doc: bool = False,
+) -> Path:
+    out_dir = _meta_dir(ticker, base_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # manager.py only needs _index.json; per-doc files are for meta_to_txt.py's CLI
+    if write_per_doc:
+        with ThreadPoolExecutor(max_workers=MAX_WRITE_WORKERS) as ex:
+            list(ex.map(lambda item: _write_doc_meta(out_dir, item), items))
 
     index_path = out_dir / "_index.json"
-    index_path.write_text(json.dumps(items, indent=2, ensure_ascii=False), encoding="utf-8")
+    # Serialize straight to bytes (no intermediate str) into a temp file, then
+    # swap it in so an interrupted run never leaves a truncated index behind
+    tmp_path = index_path.with_suffix(".json.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(orjson.dumps(items, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_path, index_path)
 
     return index_path
 
 
-def build_meta_for_ticker(api_key: str, ticker: str, base_dir: Optional[Path] = None) -> Path:
+def build_meta_for_ticker(
+    api_key: str,
+    ticker: str,
+    base_dir: Optional[Path] = None,
+    force_refresh: bool = False,
+    write_per_doc: bool = False,
+) -> Tuple[Path, List[Dict[str, Any]]]:
+    # Reuse a recent index instead of paging through the API again
+    index_path = _meta_dir(ticker, base_dir) / "_index.json"
+    if not force_refresh and index_path.exists():
+        try:
+            if time.time() - index_path.stat().st_mtime < META_CACHE_TTL_SECONDS:
+                items = orjson.loads(index_path.read_bytes())
+                if isinstance(items, list):
+                    return index_path, items
+        except (OSError, orjson.JSONDecodeError):
+            pass  # Unreadable or corrupt index: re-fetch below
+
     items = list_transcript_documents_by_ticker(api_key, ticker)
-    return write_meta_files(ticker, items, base_dir=base_dir)
+    return write_meta_files(ticker, items, base_dir=base_dir, write_per_doc=write_per_doc), items
 
 
 def main():
@@ -105,7 +209,7 @@ def main():
     if len(sys.argv) >= 2:
         ticker = sys.argv[1].strip().upper()
 
-    index_path = build_meta_for_ticker(api_key, ticker)
+    index_path, _ = build_meta_for_ticker(api_key, ticker, force_refresh=True, write_per_doc=True)
     print(f"Ticker: {ticker}")
     print(f"Index written: {index_path}")
 
@@ -1,18 +1,60 @@
-import json
 import os
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 from get_meta import build_meta_for_ticker
 from meta_to_txt import meta_obj_to_txt
-from slides_to_txt import list_slide_decks_for_event, slide_deck_obj_to_txt
+from slides_to_txt import list_slide_decks_for_events, slide_deck_obj_to_txt
+
+# Events are network-bound; keep this below the session's connection pool size
+MAX_EVENT_WORKERS = 8
 
 
 def choose_best(items: list[dict], key: str = "updatedAt") -> dict:
     def k(x):
         v = x.get(key)
         return v or ""
-    return sorted(items, key=k, reverse=True)[0] if items else {}
+    return max(items, key=k, default={})
+
+
+def process_event(
+    api_key: str,
+    ticker: str,
+    event_id: int,
+    transcript_metas: list[dict],
+    decks: list[dict],
+    base_dir: Path,
+) -> tuple[bool, str]:
+    transcript_meta = choose_best(transcript_metas, key="updatedAt")
+    deck_meta = choose_best(decks, key="updatedAt")
+
+    txt_path = None
+    slides_txt_path = None
+
+    try:
+        # Write transcript text
+        txt_path = meta_obj_to_txt(api_key, ticker, transcript_meta, base_dir=base_dir)
+
+        # Write slides text (one line per page) WITHOUT saving PDFs
+        slides_txt_path = slide_deck_obj_to_txt(api_key, ticker, deck_meta, base_dir=base_dir)
+
+        return True, f"OK event {event_id}: {txt_path.name} + {slides_txt_path.name}"
+
+    except Exception as e:
+        # Optional cleanup to avoid partial outputs (stronger failsafe)
+        if txt_path and txt_path.exists():
+            try:
+                txt_path.unlink()
+            except Exception:
+                pass
+        if slides_txt_path and slides_txt_path.exists():
+            try:
+                slides_txt_path.unlink()
+            except Exception:
+                pass
+
+        return False, f"Skip event {event_id}: failed ({e})"
 
 
 def main():
@@ -28,8 +70,7 @@ def main():
         print(f"\n=== {ticker} ===")
 
         # Build transcript meta index (earnings-call filtered in get_meta.py)
-        index_path = build_meta_for_ticker(api_key, ticker, base_dir=base_dir)
-        items = json.loads(index_path.read_text(encoding="utf-8"))
+        _, items = build_meta_for_ticker(api_key, ticker, base_dir=base_dir)
         if not isinstance(items, list) or not items:
             print("No transcript metadata items found.")
             continue
@@ -43,44 +84,30 @@ def main():
         processed = 0
         skipped = 0
 
+        # List slide decks for all events up front (batched eventIds queries)
+        decks_by_event = list_slide_decks_for_events(api_key, list(by_event))
+
+        jobs = []
         for event_id, transcript_metas in by_event.items():
-            decks = list_slide_decks_for_event(api_key, event_id)
+            decks = decks_by_event.get(event_id, [])
             if not decks:
                 skipped += 1
                 print(f"Skip event {event_id}: no slide deck found.")
                 continue
-
-            transcript_meta = choose_best(transcript_metas, key="updatedAt")
-            deck_meta = choose_best(decks, key="updatedAt")
-
-            txt_path = None
-            slides_txt_path = None
-
-            try:
-                # Write transcript text
-                txt_path = meta_obj_to_txt(api_key, ticker, transcript_meta, base_dir=base_dir)
-
-                # Write slides text (one line per page) WITHOUT saving PDFs
-                slides_txt_path = slide_deck_obj_to_txt(api_key, ticker, deck_meta, base_dir=base_dir)
-
-                processed += 1
-                print(f"OK event {event_id}: {txt_path.name} + {slides_txt_path.name}")
-
-            except Exception as e:
-                # Optional cleanup to avoid partial outputs (stronger failsafe)
-                if txt_path and txt_path.exists():
-                    try:
-                        txt_path.unlink()
-                    except Exception:
-                        pass
-                if slides_txt_path and slides_txt_path.exists():
-                    try:
-                        slides_txt_path.unlink()
-                    except Exception:
-                        pass
-
-                skipped += 1
-                print(f"Skip event {event_id}: failed ({e})")
+            jobs.append((event_id, transcript_metas, decks))
+
+        with ThreadPoolExecutor(max_workers=MAX_EVENT_WORKERS) as ex:
+            futures = [
+                ex.submit(process_event, api_key, ticker, event_id, transcript_metas, decks, base_dir)
+                for event_id, transcript_metas, decks in jobs
+            ]
+            for fut in as_completed(futures):
+                ok, msg = fut.result()
+                if ok:
+                    processed += 1
+                else:
+                    skipped += 1
+                print(msg)
 
         print(f"Done {ticker}: processed={processed}, skipped={skipped}")
 
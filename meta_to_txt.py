@@ -1,29 +1,38 @@
-import json
 import os
 import re
 import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
-import requests
+import orjson
 
+from get_meta import get_session
 
+_ILLEGAL_CHARS_RE = re.compile(r'[<>:"/\\|?*\x00-\x1F]')  # Windows-illegal chars
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Upper bound on text gathered by the generic fallback walk (~8 MiB)
+MAX_DEEP_TEXT_CHARS = 8 * 1024 * 1024
+
+
+@lru_cache(maxsize=4096)
 def sanitize_filename(name: str, max_len: int = 140) -> str:
     name = name.strip()
-    name = re.sub(r'[<>:"/\\|?*\x00-\x1F]', "", name)  # Windows-illegal chars
-    name = re.sub(r"\s+", " ", name)
+    name = _ILLEGAL_CHARS_RE.sub("", name)
+    name = _WHITESPACE_RE.sub(" ", name)
     return (name[:max_len].rstrip()) or "transcript"
 
 
 def download_json(url: str, api_key: str) -> Any:
-    r = requests.get(
+    r = get_session(api_key).get(
         url,
-        headers={"x-api-key": api_key, "Accept": "application/json"},
+        headers={"Accept": "application/json"},
         timeout=120,
         allow_redirects=True,
     )
     r.raise_for_status()
-    return r.json()
+    return orjson.loads(r.content)
 
 
 def _join_text_array(arr: Any) -> str:
@@ -42,31 +51,35 @@ def _join_text_array(arr: Any) -> str:
     return "\n".join(parts).strip()
 
 
-def _deep_collect_text_fields(obj: Any, max_chunks: int = 50000) -> list[str]:
-    out: list[str] = []
-
-    def rec(x: Any):
-        if len(out) >= max_chunks:
-            return
+def _iter_text_fields(obj: Any) -> Iterator[str]:
+    # Iterative pre-order walk; children are pushed reversed so text comes out
+    # in document order, same as a recursive walk but without depth limits.
+    stack: list[Any] = [obj]
+    while stack:
+        x = stack.pop()
         if isinstance(x, dict):
             v = x.get("text")
             if isinstance(v, str) and v.strip():
-                out.append(v.strip())
-            for vv in x.values():
-                rec(vv)
+                yield v.strip()
+            stack.extend(reversed(x.values()))
         elif isinstance(x, list):
-            for vv in x:
-                rec(vv)
+            stack.extend(reversed(x))
 
-    rec(obj)
 
-    cleaned: list[str] = []
-    prev: Optional[str] = None
-    for s in out:
-        if s != prev:
-            cleaned.append(s)
-        prev = s
-    return cleaned
+def _deep_collect_text_fields(obj: Any, max_chunks: int = 50000, max_chars: int = MAX_DEEP_TEXT_CHARS) -> list[str]:
+    out: list[str] = []
+    total_len = 0
+    # Drop repeats anywhere in the document (speaker tags, boilerplate), not just adjacent ones
+    seen: set[str] = set()
+    for s in _iter_text_fields(obj):
+        if s in seen:
+            continue
+        seen.add(s)
+        out.append(s)
+        total_len += len(s) + 1
+        if len(out) >= max_chunks or total_len > max_chars:
+            break
+    return out
 
 
 def extract_text_from_raw_transcript(raw: Any) -> str:
@@ -120,7 +133,9 @@ def meta_obj_to_txt(api_key: str, ticker: str, meta_obj: dict, base_dir: Optiona
     raw = download_json(file_url, api_key)
     text = extract_text_from_raw_transcript(raw)
 
-    txt_path.write_text(text + "\n", encoding="utf-8")
+    with open(txt_path, "wb", buffering=1 << 20) as f:
+        f.write(text.encode("utf-8"))
+        f.write(b"\n")
     return txt_path
 
 
@@ -137,7 +152,7 @@ def main():
     if not meta_path.exists():
         raise SystemExit(f"Meta JSON not found: {meta_path}")
 
-    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    meta = orjson.loads(meta_path.read_bytes())
     # Support either direct object or {"data": {...}}
     meta_obj = meta["data"] if isinstance(meta.get("data"), dict) else meta
 
@@ -1,64 +1,128 @@
 import io
 import re
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import BinaryIO, Optional, Tuple
 
-import requests
-from pypdf import PdfReader
+import pypdfium2 as pdfium
+
+from get_meta import get_session
 
 API_BASE = "https://api.quartr.com/public/v3"
 
+_ILLEGAL_CHARS_RE = re.compile(r'[<>:"/\\|?*\x00-\x1F]')
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# PDFium is not thread-safe (not even across separate documents), so decks
+# processed concurrently by manager.py take turns inside the library.
+_PDFIUM_LOCK = threading.Lock()
+
 
+@lru_cache(maxsize=4096)
 def sanitize_filename(name: str, max_len: int = 160) -> str:
     name = name.strip()
-    name = re.sub(r'[<>:"/\\|?*\x00-\x1F]', "", name)
-    name = re.sub(r"\s+", " ", name)
+    name = _ILLEGAL_CHARS_RE.sub("", name)
+    name = _WHITESPACE_RE.sub(" ", name)
     return (name[:max_len].rstrip()) or "slides"
 
 
 def quartr_get(path: str, api_key: str, params: Optional[dict] = None) -> dict:
     url = f"{API_BASE}{path}"
-    r = requests.get(url, headers={"x-api-key": api_key}, params=params, timeout=60)
+    r = get_session(api_key).get(url, params=params, timeout=60)
     r.raise_for_status()
     return r.json()
 
 
+def list_slide_decks_for_events(api_key: str, event_ids: list[int], batch_size: int = 50) -> dict[int, list[dict]]:
+    """
+    One /documents/slides query per batch of event IDs (eventIds is comma-separated).
+    Returns {eventId: [deck, ...]}; events without decks are absent.
+    """
+    by_event: dict[int, list[dict]] = {}
+
+    for i in range(0, len(event_ids), batch_size):
+        chunk = event_ids[i:i + batch_size]
+        cursor = 0
+        while True:
+            resp = quartr_get(
+                "/documents/slides",
+                api_key,
+                params={
+                    "eventIds": ",".join(map(str, chunk)),
+                    "expand": "event",
+                    "limit": 200,
+                    "cursor": cursor,
+                    "direction": "asc",
+                },
+            )
+            data = resp.get("data", [])
+            if not isinstance(data, list) or not data:
+                break
+
+            for deck in data:
+                eid = deck.get("eventId")
+                if isinstance(eid, int):
+                    by_event.setdefault(eid, []).append(deck)
+
+            next_cursor = (resp.get("pagination") or {}).get("nextCursor")
+            if next_cursor is None:
+                break
+            cursor = int(next_cursor)
+
+    return by_event
+
+
 def list_slide_decks_for_event(api_key: str, event_id: int) -> list[dict]:
-    resp = quartr_get(
-        "/documents/slides",
-        api_key,
-        params={"eventIds": str(event_id), "expand": "event", "limit": 50, "direction": "asc"},
-    )
-    data = resp.get("data", [])
-    return data if isinstance(data, list) else []
+    return list_slide_decks_for_events(api_key, [event_id]).get(event_id, [])
 
 
-def _download_pdf_bytes(url: str, api_key: str) -> bytes:
-    r = requests.get(
+def _download_pdf(url: str, api_key: str) -> io.BytesIO:
+    # Stream into one buffer instead of materializing r.content
+    with get_session(api_key).get(
         url,
-        headers={"x-api-key": api_key, "Accept": "application/pdf, application/octet-stream, */*"},
+        headers={"Accept": "application/pdf, application/octet-stream, */*"},
         timeout=180,
         allow_redirects=True,
-    )
-    r.raise_for_status()
-    return r.content
+        stream=True,
+    ) as r:
+        r.raise_for_status()
+        buf = io.BytesIO()
+        for chunk in r.iter_content(chunk_size=1 << 16):
+            buf.write(chunk)
+    buf.seek(0)
+    return buf
 
 
 def _normalize_one_line(txt: str) -> str:
     txt = (txt or "").replace("\r", "\n")
-    txt = re.sub(r"\s+", " ", txt).strip()
+    txt = _WHITESPACE_RE.sub(" ", txt).strip()
     return txt
 
 
-def _pdf_bytes_to_page_lines(pdf_bytes: bytes) -> Tuple[list[str], dict]:
-    reader = PdfReader(io.BytesIO(pdf_bytes))
-    lines: list[str] = []
+def _page_text(page: pdfium.PdfPage) -> str:
+    textpage = page.get_textpage()
+    try:
+        return textpage.get_text_range()
+    finally:
+        textpage.close()
+        page.close()
+
+
+def _pdf_to_page_lines(pdf_file: BinaryIO) -> Tuple[list[str], dict]:
+    # Only the raw text-layer reads hold the lock; normalization and metrics
+    # run outside it so other decks can use PDFium in the meantime.
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(pdf_file)
+        try:
+            raw_pages = [_page_text(page) for page in pdf]
+        finally:
+            pdf.close()
+
+    lines = [_normalize_one_line(txt) for txt in raw_pages]
     non_empty = 0
     total_chars = 0
-
-    for page in reader.pages:
-        txt = _normalize_one_line(page.extract_text() or "")
-        lines.append(txt)
+    for txt in lines:
         if txt:
             non_empty += 1
             total_chars += len(txt)
@@ -109,8 +173,8 @@ def slide_deck_obj_to_txt(
     out_dir.mkdir(parents=True, exist_ok=True)
     out_path = out_dir / f"{safe_title}_event_{event_id}_deck_{deck_id}.txt"
 
-    pdf_bytes = _download_pdf_bytes(file_url, api_key)
-    lines, metrics = _pdf_bytes_to_page_lines(pdf_bytes)
+    pdf_file = _download_pdf(file_url, api_key)
+    lines, metrics = _pdf_to_page_lines(pdf_file)
 
     if metrics["pages"] == 0:
         raise RuntimeError("Slide PDF had 0 pages.")
@@ -121,5 +185,7 @@ def slide_deck_obj_to_txt(
             f"coverage={metrics['coverage']:.2f}, total_chars={metrics['total_chars']})."
         )
 
-    out_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    with open(out_path, "wb", buffering=1 << 20) as f:
+        f.write(b"\n".join(line.encode("utf-8") for line in lines))
+        f.write(b"\n")
     return out_path